@@ -2,43 +2,116 @@
 """NH EMS Week CPR Challenge — Flask Application."""
 
 import csv
+import fcntl
+import json
 import logging
 import os
 import secrets
+import sqlite3
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from functools import wraps
-from io import BytesIO, StringIO
+from functools import lru_cache, wraps
+from io import StringIO
 
 from flask import (Flask, render_template, request, jsonify, redirect,
-                   url_for, session, send_file, flash, abort, Response, make_response)
+                   url_for, session, send_file, flash, abort, Response, make_response,
+                   stream_with_context)
+from flask.json.provider import DefaultJSONProvider
 from flask_wtf.csrf import CSRFProtect
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from dotenv import load_dotenv
+import boto3
+from botocore.exceptions import ClientError
+import orjson
 
-from models import db, User, Training, RSVP, Attendance, Certificate, Settings, Subscriber, COUNCILORS, DISTRICT_COLORS
+# Load .env before importing local modules that read settings at import time
+load_dotenv()
+
+from models import (db, User, Training, RSVP, Attendance, Certificate, Settings, Subscriber,
+                    COUNCILORS, DISTRICT_COLORS, TRAINING_API_FIELDS)
 from emails import (send_rsvp_confirmation, send_rsvp_notification_to_host,
-                    send_training_approved, send_certificate_ready,
+                    send_training_approved, send_certificates_ready,
                     send_host_application_received, send_admin_new_host_application,
-                    send_host_post_event_reminder, send_subscriber_training_notification,
-                    send_training_cancelled_to_rsvp)
-from certificates import generate_certificate
+                    send_host_post_event_reminder, send_subscriber_training_notifications,
+                    send_training_cancelled_to_rsvps, register_templates)
+import certificates
+from certificates import write_certificate, generate_certificates_bulk
 from geocode import geocode_address
 
-load_dotenv()
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, which encodes straight to bytes.
+
+    Calls that pass stdlib-specific kwargs (the session serializer's
+    object_hook, for one) fall back to the default provider.
+    """
+
+    def _options(self):
+        return orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-change-me')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///cpr_challenge.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Wait on a locked database instead of failing immediately
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+else:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+app.config['CERTIFICATE_CACHE_DIR'] = os.getenv(
+    'CERTIFICATE_CACHE_DIR', os.path.join(app.instance_path, 'certificates'))
+# Optional private S3 bucket for certificate PDFs; downloads redirect to a
+# short-lived presigned URL instead of streaming the file through the app
+app.config['CERT_BUCKET'] = os.getenv('CERT_BUCKET')
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
 db.init_app(app)
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers proceed during a write; NORMAL sync is safe under WAL."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-20000')
+        cursor.close()
+
 csrf = CSRFProtect(app)
 
 login_manager = LoginManager()
@@ -68,7 +141,7 @@ def security_headers(response):
 # ---------------------------------------------------------------------------
 @app.context_processor
 def inject_globals():
-    has_approved = Training.query.filter(Training.status.in_(['approved', 'completed'])).first() is not None
+    has_approved = _has_listed_trainings()
     pending_nav = 0
     if current_user.is_authenticated and current_user.role == 'admin':
         pending_nav = Training.query.filter_by(status='pending').count()
@@ -104,8 +177,8 @@ def host_or_admin_required(f):
 
 
 def get_setting(key, default=None):
-    s = Settings.query.get(key)
-    return s.value if s else default
+    settings = _load_settings()
+    return settings[key] if key in settings else default
 
 
 def set_setting(key, value):
@@ -116,6 +189,7 @@ def set_setting(key, value):
         s = Settings(key=key, value=value)
         db.session.add(s)
     db.session.commit()
+    _load_settings.cache_clear()
 
 
 # ---------------------------------------------------------------------------
@@ -131,19 +205,150 @@ def generate_host_token():
     return secrets.token_hex(32)
 
 
+def ttl_cache(seconds, maxsize=32):
+    """Memoize a function's return value per-process for `seconds`.
+
+    Cached values are keyed on positional args; expired entries are dropped on
+    the next miss, and the cache is emptied if it still holds `maxsize` keys.
+    Call `func.cache_clear()` after a write that changes the underlying data.
+    """
+    def decorator(func):
+        entries = {}
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            hit = entries.get(args)
+            if hit and hit[0] > now:
+                return hit[1]
+            value = func(*args)
+            for key, (expires, _) in list(entries.items()):
+                if expires <= now:
+                    entries.pop(key, None)
+            if len(entries) >= maxsize:
+                entries.clear()
+            entries[args] = (now + seconds, value)
+            return value
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
+
+
+@ttl_cache(60)
+def _load_settings():
+    """All settings rows as a dict; they change only via set_setting()."""
+    return {s.key: s.value for s in Settings.query.all()}
+
+
+@ttl_cache(60)
 def get_district_counts():
     """Get trained-people counts per district."""
-    counts = {}
-    for d in range(1, 6):
-        # Use approved attendance reports
-        att = db.session.query(db.func.sum(Attendance.reported_count)).join(Training).filter(
-            Training.district == d,
-            Attendance.approved == True
-        ).scalar() or 0
-        counts[d] = int(att)
+    # Use approved attendance reports, one round-trip for all districts
+    rows = db.session.query(
+        Training.district, db.func.sum(Attendance.reported_count)
+    ).join(Attendance, Attendance.training_id == Training.id).filter(
+        Attendance.approved.is_(True)
+    ).group_by(Training.district).all()
+    counts = {d: 0 for d in range(1, 6)}
+    counts.update({d: int(c or 0) for d, c in rows})
     return counts
 
 
+@ttl_cache(60)
+def _has_listed_trainings():
+    """Whether any training is approved or completed (gates the leaderboard link)."""
+    return db.session.query(
+        db.session.query(Training.id).filter(
+            Training.status.in_(['approved', 'completed'])
+        ).exists()
+    ).scalar()
+
+
+def invalidate_public_caches():
+    """Drop cached public data after an admin or RSVP write changes it."""
+    for cached in (get_district_counts, _has_listed_trainings, _approved_trainings_json,
+                   _districts_payload, _sitemap_xml):
+        cached.cache_clear()
+
+
+# ---------------------------------------------------------------------------
+# Background email dispatch
+# ---------------------------------------------------------------------------
+_email_executor = ThreadPoolExecutor(max_workers=int(os.getenv('EMAIL_WORKERS', '4')),
+                                     thread_name_prefix='email')
+
+
+def send_in_background(job, *args):
+    """Run an email job on the background pool so SES latency stays off the request.
+
+    Jobs take IDs, not ORM objects, and re-load what they need inside their
+    own app context — request-bound session state never crosses threads.
+    """
+    def run():
+        with app.app_context():
+            try:
+                job(*args)
+            except Exception as e:
+                logger.error("Background email error in %s: %s", job.__name__, e)
+    _email_executor.submit(run)
+
+
+def _email_admin_new_application(training_id):
+    send_admin_new_host_application(db.session.get(Training, training_id))
+
+
+def _email_host_new_rsvp(rsvp_id):
+    rsvp = RSVP.query.options(joinedload(RSVP.training)).filter_by(id=rsvp_id).one()
+    send_rsvp_notification_to_host(rsvp, rsvp.training)
+
+
+def _email_training_approved(training_id, subscriber_emails):
+    training = db.session.get(Training, training_id)
+    try:
+        send_training_approved(training)
+    except Exception as e:
+        logger.error("Training approval email error: %s", e)
+
+    try:
+        notified = send_subscriber_training_notifications(subscriber_emails, training)
+    except Exception as e:
+        logger.error("Subscriber notification error for training %d: %s", training_id, e)
+        notified = 0
+    logger.info("Notified %d of %d subscriber(s) for training %d",
+                notified, len(subscriber_emails), training_id)
+
+
+def _email_training_cancelled(training_id):
+    rsvps = RSVP.query.options(joinedload(RSVP.training)).filter_by(training_id=training_id).all()
+    if not rsvps:
+        return
+    try:
+        sent = send_training_cancelled_to_rsvps(rsvps, rsvps[0].training)
+    except Exception as e:
+        logger.error("Cancellation email error for training %d: %s", training_id, e)
+        sent = 0
+    logger.info("Notified %d of %d RSVP(s) that training %d is cancelled",
+                sent, len(rsvps), training_id)
+
+
+def _email_certificates_ready(certificate_numbers):
+    certs = Certificate.query.options(
+        joinedload(Certificate.rsvp).joinedload(RSVP.training)
+    ).filter(Certificate.certificate_number.in_(certificate_numbers)).all()
+    # Render the whole batch before the links go out
+    try:
+        render_certificate_pdfs(certs)
+    except Exception as e:
+        logger.error("Certificate pre-render error: %s", e)
+    try:
+        sent = send_certificates_ready(certs)
+    except Exception as e:
+        logger.error("Certificate email error: %s", e)
+        sent = 0
+    logger.info("Sent %d of %d certificate email(s)", sent, len(certs))
+
+
 # =========================================================================
 # PUBLIC ROUTES
 # =========================================================================
@@ -153,7 +358,10 @@ def index():
     district_counts = get_district_counts()
     total = sum(district_counts.values())
     goal = int(get_setting('goal_target', '1000'))
-    upcoming = Training.query.filter_by(status='approved').filter(
+    upcoming = Training.query.options(load_only(
+        Training.id, Training.location_name, Training.city, Training.district,
+        Training.date, Training.start_time, Training.capacity, Training.rsvp_count,
+    )).filter_by(status='approved').filter(
         Training.date >= date.today()
     ).order_by(Training.date).limit(3).all()
     return render_template('index.html',
@@ -166,7 +374,11 @@ def index():
 @app.route('/trainings')
 def trainings():
     district_filter = request.args.get('district', type=int)
-    query = Training.query.filter_by(status='approved').filter(
+    query = Training.query.options(load_only(
+        Training.id, Training.organization, Training.location_name, Training.address,
+        Training.city, Training.district, Training.date, Training.start_time,
+        Training.end_time, Training.capacity, Training.description, Training.rsvp_count,
+    )).filter_by(status='approved').filter(
         Training.date >= date.today()
     ).order_by(Training.date)
     if district_filter:
@@ -250,10 +462,7 @@ def host():
             logger.error("Host confirmation email error: %s", e)
             email_ok = False
 
-        try:
-            send_admin_new_host_application(training)
-        except Exception as e:
-            logger.error("Admin notification email error: %s", e)
+        send_in_background(_email_admin_new_application, training.id)
 
         if email_ok:
             flash('Thank you! Your training application has been submitted. Check your email for confirmation.', 'success')
@@ -278,13 +487,16 @@ def rsvp(training_id):
             flash('Name and email are required.', 'error')
             return redirect(url_for('rsvp', training_id=training_id))
 
-        # Check for duplicate
-        existing = RSVP.query.filter_by(training_id=training_id, email=email).first()
+        # Check for duplicate and capacity in a single round-trip
+        rsvp_total, existing = db.session.query(
+            db.func.count(RSVP.id),
+            db.func.count(db.case((RSVP.email == email, 1))),
+        ).filter(RSVP.training_id == training_id).one()
         if existing:
             flash('You have already RSVPed for this training.', 'warning')
             return redirect(url_for('rsvp', training_id=training_id))
 
-        if training.is_full:
+        if rsvp_total >= training.capacity:
             flash('Sorry, this training is full.', 'error')
             return redirect(url_for('rsvp', training_id=training_id))
 
@@ -304,20 +516,26 @@ def rsvp(training_id):
                 flash('Sorry, this training just filled up.', 'error')
                 return redirect(url_for('rsvp', training_id=training_id))
             db.session.commit()
+        except IntegrityError:
+            # uq_rsvp_training_email caught a concurrent duplicate
+            db.session.rollback()
+            flash('You have already RSVPed for this training.', 'warning')
+            return redirect(url_for('rsvp', training_id=training_id))
         except Exception:
             db.session.rollback()
             flash('Could not complete your RSVP. Please try again.', 'error')
             return redirect(url_for('rsvp', training_id=training_id))
+        invalidate_public_caches()
 
         # Send emails (non-blocking — if SES fails, RSVP is still saved)
         email_ok = True
         try:
             if not send_rsvp_confirmation(new_rsvp, training):
                 email_ok = False
-            send_rsvp_notification_to_host(new_rsvp, training)
         except Exception as e:
             logger.error("RSVP email error: %s", e)
             email_ok = False
+        send_in_background(_email_host_new_rsvp, new_rsvp.id)
 
         if email_ok:
             flash("You're registered! Check your email for confirmation details.", 'success')
@@ -385,21 +603,49 @@ def subscribe():
 @csrf.exempt
 @app.route('/api/trainings')
 def api_trainings():
-    query = Training.query.filter_by(status='approved')
+    # Unknown districts fall back to the full list, keeping the cache to six keys
     district = request.args.get('district', type=int)
+    if district not in DISTRICT_COLORS:
+        district = None
+    return Response(_approved_trainings_json(district), mimetype='application/json')
+
+
+# API fields, plus rsvp_count for spots_remaining
+_TRAINING_API_COLUMNS = tuple(getattr(Training, name) for name in TRAINING_API_FIELDS) + (
+    Training.date, Training.rsvp_count,
+)
+
+
+@ttl_cache(60)
+def _approved_trainings_json(district):
+    """Encoded /api/trainings body: TRAINING_API_FIELDS plus date and spots_remaining.
+
+    Rows come from a plain column query, so no ORM objects are built, and the
+    cache holds the finished bytes rather than re-encoding on every hit.
+    """
+    query = db.session.query(*_TRAINING_API_COLUMNS).filter(Training.status == 'approved')
     if district:
-        query = query.filter_by(district=district)
-    trainings = query.all()
-    return jsonify([t.to_dict() for t in trainings])
+        query = query.filter(Training.district == district)
+    trainings = []
+    for row in query:
+        item = row._asdict()
+        item['spots_remaining'] = max(0, item['capacity'] - item.pop('rsvp_count'))
+        trainings.append(item)
+    return orjson.dumps(trainings, option=orjson.OPT_SORT_KEYS)
 
 
 @csrf.exempt
 @app.route('/api/districts')
 def api_districts():
+    return jsonify(_districts_payload())
+
+
+@ttl_cache(60)
+def _districts_payload():
     counts = get_district_counts()
     total = sum(counts.values())
     goal = int(get_setting('goal_target', '1000'))
-    return jsonify({
+    return {
         'districts': {str(d): {
             'count': c,
             'councilor': COUNCILORS[d]['name'],
@@ -407,13 +653,75 @@ def api_districts():
         } for d, c in counts.items()},
         'total': total,
         'goal': goal,
-    })
+    }
+
+
+_GEOJSON_PATH = os.path.join(app.root_path, 'static', 'data', 'ec-districts.geojson')
+_GEOJSON_GZ_PATH = _GEOJSON_PATH + '.gz'
 
 
 @csrf.exempt
 @app.route('/api/ec-districts.geojson')
 def api_geojson():
-    return send_file('static/data/ec-districts.geojson', mimetype='application/json')
+    # Serve the pre-gzipped copy (written by simplify_geojson.py) when accepted
+    gzipped = request.accept_encodings['gzip'] > 0 and os.path.exists(_GEOJSON_GZ_PATH)
+    # Only changes on deploy: let browsers/CDNs cache it and revalidate via ETag (304)
+    response = send_file(_GEOJSON_GZ_PATH if gzipped else _GEOJSON_PATH,
+                         mimetype='application/json',
+                         max_age=86400, conditional=True, etag=True)
+    if gzipped:
+        response.content_encoding = 'gzip'
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    return response
+
+
+def _load_district_polygons():
+    """Load EC district exterior rings, with bounding boxes, for point lookups.
+
+    The GeoJSON only changes on deploy, so it is parsed once at import.
+    Returns a list of (district, (minx, miny, maxx, maxy), edges) where
+    edges come from _ring_edges().
+    """
+    geojson_path = os.path.join(app.static_folder, 'data', 'ec-districts.geojson')
+    with open(geojson_path) as f:
+        geojson = json.load(f)
+
+    polygons = []
+    for feature in geojson['features']:
+        geom = feature['geometry']
+        if geom['type'] == 'Polygon':
+            polys = [geom['coordinates']]
+        elif geom['type'] == 'MultiPolygon':
+            polys = geom['coordinates']
+        else:
+            continue
+        for poly in polys:
+            ring = poly[0]  # exterior ring
+            xs = [p[0] for p in ring]
+            ys = [p[1] for p in ring]
+            bbox = (min(xs), min(ys), max(xs), max(ys))
+            polygons.append((feature['properties']['district'], bbox, _ring_edges(ring)))
+    return polygons
+
+
+def _ring_edges(ring):
+    """Precompute ray-casting edges for a ring as (yi, yj, xi, dx/dy) tuples.
+
+    Horizontal edges can never cross the ray, so they are dropped up front.
+    """
+    edges = []
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if yi != yj:
+            edges.append((yi, yj, xi, (xj - xi) / (yj - yi)))
+        j = i
+    return edges
+
+
+_DISTRICT_POLYGONS = _load_district_polygons()
 
 
 @csrf.exempt
@@ -425,41 +733,21 @@ def api_detect_district():
     if lat is None or lng is None:
         return jsonify({'error': 'lat and lng required'}), 400
 
-    import json
-    geojson_path = os.path.join(app.static_folder, 'data', 'ec-districts.geojson')
-    with open(geojson_path) as f:
-        geojson = json.load(f)
-
-    for feature in geojson['features']:
-        district = feature['properties']['district']
-        geom = feature['geometry']
-        if _point_in_geometry(lng, lat, geom):
+    for district, (minx, miny, maxx, maxy), edges in _DISTRICT_POLYGONS:
+        if not (minx <= lng <= maxx and miny <= lat <= maxy):
+            continue
+        if _point_in_polygon(lng, lat, edges):
             return jsonify({'district': district, 'councilor': COUNCILORS[district]['name']})
 
     return jsonify({'district': None})
 
 
-def _point_in_geometry(x, y, geometry):
-    """Check if point (x,y) is inside a GeoJSON geometry (Polygon or MultiPolygon)."""
-    if geometry['type'] == 'Polygon':
-        return _point_in_polygon(x, y, geometry['coordinates'])
-    elif geometry['type'] == 'MultiPolygon':
-        return any(_point_in_polygon(x, y, poly) for poly in geometry['coordinates'])
-    return False
-
-
-def _point_in_polygon(x, y, coordinates):
-    """Ray-casting algorithm for point-in-polygon. coordinates is a list of rings."""
-    ring = coordinates[0]  # exterior ring
-    n = len(ring)
+def _point_in_polygon(x, y, edges):
+    """Ray-casting algorithm for point-in-polygon over precomputed ring edges."""
     inside = False
-    j = n - 1
-    for i in range(n):
-        xi, yi = ring[i]
-        xj, yj = ring[j]
-        if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
+    for yi, yj, xi, slope in edges:
+        if ((yi > y) != (yj > y)) and (x < (y - yi) * slope + xi):
             inside = not inside
-        j = i
     return inside
 
 
@@ -491,16 +779,17 @@ def host_report(host_token):
 
         # Mark individual RSVPs as attended if provided
         attended_ids = request.form.getlist('attended')
-        for rsvp_item in training.rsvps.all():
+        for rsvp_item in training.rsvps:
             rsvp_item.attended = str(rsvp_item.id) in attended_ids
 
         training.status = 'completed'
         db.session.commit()
+        invalidate_public_caches()
 
         flash('Thank you! Your attendance report has been submitted.', 'success')
         return redirect(url_for('host_report', host_token=host_token))
 
-    rsvps = training.rsvps.all()
+    rsvps = training.rsvps
     return render_template('host_report.html', training=training,
                            rsvps=rsvps, existing_report=existing_report)
 
@@ -512,7 +801,7 @@ def host_report(host_token):
 @app.route('/host/dashboard')
 @host_or_admin_required
 def host_dashboard():
-    my_trainings = Training.query.filter_by(
+    my_trainings = Training.query.options(selectinload(Training.attendances)).filter_by(
         host_user_id=current_user.id
     ).order_by(Training.date.desc()).all()
     return render_template('host/dashboard.html', trainings=my_trainings)
@@ -524,7 +813,7 @@ def host_training_detail(training_id):
     training = Training.query.get_or_404(training_id)
     if training.host_user_id != current_user.id and current_user.role != 'admin':
         abort(403)
-    rsvps = training.rsvps.all()
+    rsvps = training.rsvps
     existing_report = Attendance.query.filter_by(training_id=training.id).first()
     return render_template('host/training_detail.html', training=training,
                            rsvps=rsvps, existing_report=existing_report)
@@ -556,16 +845,17 @@ def host_training_report(training_id):
         db.session.add(attendance)
 
         attended_ids = request.form.getlist('attended')
-        for rsvp_item in training.rsvps.all():
+        for rsvp_item in training.rsvps:
             rsvp_item.attended = str(rsvp_item.id) in attended_ids
 
         training.status = 'completed'
         db.session.commit()
+        invalidate_public_caches()
 
         flash('Thank you! Your attendance report has been submitted.', 'success')
         return redirect(url_for('host_training_detail', training_id=training_id))
 
-    rsvps = training.rsvps.all()
+    rsvps = training.rsvps
     return render_template('host/report.html', training=training,
                            rsvps=rsvps, existing_report=existing_report)
 
@@ -574,9 +864,93 @@ def host_training_report(training_id):
 # CERTIFICATES
 # =========================================================================
 
+def _certificate_cache_path(cert):
+    return os.path.join(app.config['CERTIFICATE_CACHE_DIR'], f'{cert.certificate_number}.pdf')
+
+
+def _certificate_fields(cert):
+    return (cert.rsvp.name, cert.rsvp.training.date.strftime('%B %d, %Y'),
+            cert.rsvp.training.location_name, cert.certificate_number)
+
+
+def _write_certificate_file(path, write):
+    """Atomically create path, passing its open file to write()."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename so a concurrent download never sees a partial file
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def certificate_pdf_path(cert):
+    """Path to the rendered PDF for a certificate, generating it on first use.
+
+    A certificate's content is fixed at issue time, so the PDF is written
+    to disk once and every later download is served from that file.
+    """
+    path = _certificate_cache_path(cert)
+    if not os.path.exists(path):
+        fields = _certificate_fields(cert)
+        _write_certificate_file(path, lambda f: write_certificate(f, *fields))
+    return path
+
+
+def render_certificate_pdfs(certs):
+    """Render any uncached certificates in one parallel batch."""
+    missing = [cert for cert in certs if not os.path.exists(_certificate_cache_path(cert))]
+    pdfs = generate_certificates_bulk([_certificate_fields(cert) for cert in missing])
+    for cert, data in zip(missing, pdfs):
+        _write_certificate_file(_certificate_cache_path(cert), lambda f, data=data: f.write(data))
+    if app.config['CERT_BUCKET']:
+        for cert in certs:
+            upload_certificate_pdf(cert)
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    return boto3.client(
+        's3',
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+    )
+
+
+def _certificate_s3_key(cert):
+    return f'certs/{cert.certificate_number}.pdf'
+
+
+def upload_certificate_pdf(cert):
+    """Copy a certificate's rendered PDF into the (private) certificate bucket."""
+    with open(certificate_pdf_path(cert), 'rb') as f:
+        get_s3_client().put_object(
+            Bucket=app.config['CERT_BUCKET'], Key=_certificate_s3_key(cert), Body=f,
+            ContentType='application/pdf', CacheControl='private, max-age=31536000, immutable',
+        )
+
+
+def certificate_download_url(cert):
+    """Presigned S3 URL for a certificate, uploading it first if it's missing."""
+    client = get_s3_client()
+    bucket = app.config['CERT_BUCKET']
+    key = _certificate_s3_key(cert)
+    try:
+        client.head_object(Bucket=bucket, Key=key)
+    except ClientError:
+        upload_certificate_pdf(cert)
+    return client.generate_presigned_url('get_object', ExpiresIn=300, Params={
+        'Bucket': bucket,
+        'Key': key,
+        'ResponseContentDisposition': f'attachment; filename="CPR_Certificate_{cert.certificate_number}.pdf"',
+    })
+
+
 @app.route('/certificate/<certificate_number>', methods=['GET', 'POST'])
 def download_certificate(certificate_number):
-    cert = Certificate.query.filter_by(certificate_number=certificate_number).first_or_404()
+    cert = Certificate.query.options(
+        joinedload(Certificate.rsvp).joinedload(RSVP.training)
+    ).filter_by(certificate_number=certificate_number).first_or_404()
     rsvp = cert.rsvp
     training = rsvp.training
 
@@ -590,17 +964,21 @@ def download_certificate(certificate_number):
         flash('The email address does not match our records for this certificate.', 'error')
         return redirect(url_for('download_certificate', certificate_number=certificate_number))
 
-    pdf = generate_certificate(
-        name=rsvp.name,
-        date_str=training.date.strftime('%B %d, %Y'),
-        location=training.location_name,
-        certificate_number=cert.certificate_number,
-    )
+    download_url = None
+    if app.config['CERT_BUCKET']:
+        try:
+            download_url = certificate_download_url(cert)
+        except Exception as e:
+            logger.error("Certificate S3 error for %s: %s", cert.certificate_number, e)
+    pdf_path = None if download_url else certificate_pdf_path(cert)
 
-    cert.downloaded = True
-    db.session.commit()
+    if not cert.downloaded:
+        cert.downloaded = True
+        db.session.commit()
 
-    return send_file(pdf, mimetype='application/pdf',
+    if download_url:
+        return redirect(download_url)
+    return send_file(pdf_path, mimetype='application/pdf',
                      download_name=f'CPR_Certificate_{cert.certificate_number}.pdf',
                      as_attachment=True)
 
@@ -652,24 +1030,32 @@ def admin_logout():
 @app.route('/admin')
 @admin_required
 def admin_dashboard():
-    total_trainings = Training.query.count()
-    pending = Training.query.filter_by(status='pending').count()
-    approved = Training.query.filter_by(status='approved').count()
-    completed = Training.query.filter_by(status='completed').count()
-    total_rsvps = RSVP.query.count()
-    total_subscribers = Subscriber.query.count()
+    status_counts = dict(db.session.query(
+        Training.status, db.func.count(Training.id)
+    ).group_by(Training.status).all())
+    total_trainings = sum(status_counts.values())
+    pending = status_counts.get('pending', 0)
+    approved = status_counts.get('approved', 0)
+    completed = status_counts.get('completed', 0)
+    # Remaining table counts in one round-trip via scalar subqueries
+    total_rsvps, total_subscribers, total_users, unapproved_attendance = db.session.execute(db.select(
+        db.select(db.func.count(RSVP.id)).scalar_subquery(),
+        db.select(db.func.count(Subscriber.id)).scalar_subquery(),
+        db.select(db.func.count(User.id)).scalar_subquery(),
+        db.select(db.func.count(Attendance.id)).where(Attendance.approved == False).scalar_subquery(),
+    )).one()
     subscriber_by_district = dict(db.session.query(
         Subscriber.district, db.func.count()
     ).group_by(Subscriber.district).all())
-    total_users = User.query.count()
     district_counts = get_district_counts()
     total_trained = sum(district_counts.values())
     goal = int(get_setting('goal_target', '1000'))
-    unapproved_attendance = Attendance.query.filter_by(approved=False).count()
     upcoming = Training.query.filter_by(status='approved').filter(
         Training.date >= date.today()
     ).order_by(Training.date).limit(5).all()
-    recent_rsvps = RSVP.query.order_by(RSVP.created_at.desc()).limit(8).all()
+    recent_rsvps = RSVP.query.options(joinedload(RSVP.training)).order_by(
+        RSVP.created_at.desc()
+    ).limit(8).all()
     recent_trainings = Training.query.order_by(Training.created_at.desc()).limit(5).all()
     return render_template('admin/dashboard.html',
                            total_trainings=total_trainings,
@@ -693,7 +1079,7 @@ def admin_dashboard():
 @admin_required
 def admin_trainings():
     status_filter = request.args.get('status', '')
-    query = Training.query.order_by(Training.created_at.desc())
+    query = Training.query.options(selectinload(Training.attendances)).order_by(Training.created_at.desc())
     if status_filter:
         query = query.filter_by(status=status_filter)
     all_trainings = query.all()
@@ -716,27 +1102,16 @@ def admin_approve_training(training_id):
             training.longitude = lng
 
     db.session.commit()
+    invalidate_public_caches()
 
-    try:
-        send_training_approved(training)
-    except Exception as e:
-        logger.error("Training approval email error: %s", e)
-
-    # Notify subscribers in this district
-    subscribers = Subscriber.query.filter(
+    # Notify the host and subscribers in this district
+    subscriber_emails = [email for (email,) in db.session.query(Subscriber.email).filter(
         (Subscriber.district == training.district) | (Subscriber.district.is_(None))
-    ).all()
-    notified = 0
-    for sub in subscribers:
-        try:
-            send_subscriber_training_notification(sub.email, training)
-            notified += 1
-        except Exception as e:
-            logger.error("Subscriber notification error for %s: %s", sub.email, e)
-    if notified:
-        logger.info("Notified %d subscriber(s) for training %d", notified, training.id)
+    ).all()]
+    send_in_background(_email_training_approved, training.id, subscriber_emails)
 
-    flash(f'Training by {training.host_name} approved. {notified} subscriber(s) notified.', 'success')
+    flash(f'Training by {training.host_name} approved. '
+          f'{len(subscriber_emails)} subscriber(s) being notified.', 'success')
     return redirect(url_for('admin_trainings'))
 
 
@@ -744,23 +1119,16 @@ def admin_approve_training(training_id):
 @admin_required
 def admin_reject_training(training_id):
     training = Training.query.get_or_404(training_id)
-    rsvp_count = training.rsvps.count()
+    rsvp_count = training.rsvp_count
     training.status = 'cancelled'
     db.session.commit()
+    invalidate_public_caches()
 
     # Notify RSVPed attendees that the training is cancelled
-    notified = 0
-    if rsvp_count > 0:
-        for rsvp_item in training.rsvps.all():
-            try:
-                send_training_cancelled_to_rsvp(rsvp_item, training)
-                notified += 1
-            except Exception as e:
-                logger.error("Cancellation email error for %s: %s", rsvp_item.email, e)
-
     msg = f'Training by {training.host_name} cancelled.'
-    if notified:
-        msg += f' {notified} RSVP(s) notified.'
+    if rsvp_count > 0:
+        send_in_background(_email_training_cancelled, training.id)
+        msg += f' {rsvp_count} RSVP(s) being notified.'
     flash(msg, 'warning')
     return redirect(url_for('admin_trainings'))
 
@@ -771,6 +1139,7 @@ def admin_complete_training(training_id):
     training = Training.query.get_or_404(training_id)
     training.status = 'completed'
     db.session.commit()
+    invalidate_public_caches()
     flash(f'Training marked as completed.', 'success')
     return redirect(url_for('admin_trainings'))
 
@@ -779,11 +1148,15 @@ def admin_complete_training(training_id):
 @admin_required
 def admin_rsvps():
     training_id = request.args.get('training_id', type=int)
-    query = RSVP.query.order_by(RSVP.created_at.desc())
+    query = RSVP.query.options(
+        joinedload(RSVP.training), joinedload(RSVP.certificate)
+    ).order_by(RSVP.created_at.desc())
     if training_id:
         query = query.filter_by(training_id=training_id)
     all_rsvps = query.all()
-    trainings_list = Training.query.order_by(Training.date).all()
+    trainings_list = db.session.query(
+        Training.id, Training.location_name, Training.date, Training.rsvp_count,
+    ).order_by(Training.date).all()
     return render_template('admin/rsvps.html', rsvps=all_rsvps,
                            trainings_list=trainings_list,
                            training_id=training_id)
@@ -821,6 +1194,7 @@ def admin_attendance(training_id):
         training.status = 'completed'
 
     db.session.commit()
+    invalidate_public_caches()
     flash(f'Attendance of {count} recorded and approved.', 'success')
     return redirect(url_for('admin_trainings'))
 
@@ -831,6 +1205,7 @@ def admin_approve_attendance(attendance_id):
     att = Attendance.query.get_or_404(attendance_id)
     att.approved = True
     db.session.commit()
+    invalidate_public_caches()
     flash('Attendance report approved.', 'success')
     return redirect(url_for('admin_trainings'))
 
@@ -839,21 +1214,35 @@ def admin_approve_attendance(attendance_id):
 @admin_required
 def admin_issue_certificates(training_id):
     training = Training.query.get_or_404(training_id)
-    issued = 0
-    for rsvp in training.rsvps.filter_by(attended=True).all():
-        if not rsvp.certificate:
-            cert = Certificate(
-                rsvp_id=rsvp.id,
-                certificate_number=generate_cert_number(),
-            )
-            db.session.add(cert)
-            issued += 1
-            try:
-                db.session.flush()
-                send_certificate_ready(rsvp, cert)
-            except Exception as e:
-                logger.error("Certificate email error: %s", e)
-    db.session.commit()
+    rsvp_ids = [rsvp_id for (rsvp_id,) in db.session.query(RSVP.id).filter(
+        RSVP.training_id == training.id,
+        RSVP.attended.is_(True),
+        ~RSVP.certificate.has(),
+    ).all()]
+
+    # Allocate every number up front and insert in one commit; on the rare
+    # collision with an existing number, draw a fresh batch and retry.
+    numbers = []
+    for attempt in range(3):
+        numbers = set()
+        while len(numbers) < len(rsvp_ids):
+            numbers.add(generate_cert_number())
+        numbers = list(numbers)
+        db.session.add_all([Certificate(rsvp_id=rsvp_id, certificate_number=number)
+                            for rsvp_id, number in zip(rsvp_ids, numbers)])
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            logger.warning("Certificate number collision issuing for training %d, retrying", training_id)
+    else:
+        flash('Could not issue certificates. Please try again.', 'error')
+        return redirect(url_for('admin_trainings'))
+
+    issued = len(numbers)
+    if numbers:
+        send_in_background(_email_certificates_ready, numbers)
     flash(f'{issued} certificates issued.', 'success')
     return redirect(url_for('admin_trainings'))
 
@@ -861,48 +1250,67 @@ def admin_issue_certificates(training_id):
 @app.route('/admin/export/csv/<data_type>')
 @admin_required
 def admin_export_csv(data_type):
-    si = StringIO()
-    writer = csv.writer(si)
-
     if data_type == 'trainings':
-        writer.writerow(['ID', 'Host', 'Email', 'Phone', 'Organization', 'Location',
-                          'Address', 'City', 'Zip', 'District', 'Date', 'Time',
-                          'Capacity', 'Status', 'RSVPs', 'Created'])
-        for t in Training.query.order_by(Training.date).all():
-            writer.writerow([t.id, t.host_name, t.host_email, t.host_phone,
-                              t.organization, t.location_name, t.address, t.city,
-                              t.zip_code, t.district, t.date, t.start_time,
-                              t.capacity, t.status, t.rsvps.count(), t.created_at])
+        header = ['ID', 'Host', 'Email', 'Phone', 'Organization', 'Location',
+                  'Address', 'City', 'Zip', 'District', 'Date', 'Time',
+                  'Capacity', 'Status', 'RSVPs', 'Created']
+
+        def rows():
+            for t in Training.query.order_by(Training.date).yield_per(500):
+                yield [t.id, t.host_name, t.host_email, t.host_phone,
+                       t.organization, t.location_name, t.address, t.city,
+                       t.zip_code, t.district, t.date, t.start_time,
+                       t.capacity, t.status, t.rsvp_count, t.created_at]
 
     elif data_type == 'rsvps':
-        writer.writerow(['ID', 'Training', 'Training Date', 'Name', 'Email',
-                          'Phone', 'District', 'RSVP Date', 'Attended'])
-        for r in RSVP.query.order_by(RSVP.created_at).all():
-            writer.writerow([r.id, r.training.location_name, r.training.date,
-                              r.name, r.email, r.phone, r.district,
-                              r.created_at, r.attended])
+        header = ['ID', 'Training', 'Training Date', 'Name', 'Email',
+                  'Phone', 'District', 'RSVP Date', 'Attended']
+
+        def rows():
+            query = RSVP.query.options(joinedload(RSVP.training)).order_by(RSVP.created_at)
+            for r in query.yield_per(500):
+                yield [r.id, r.training.location_name, r.training.date,
+                       r.name, r.email, r.phone, r.district,
+                       r.created_at, r.attended]
 
     elif data_type == 'certificates':
-        writer.writerow(['Certificate #', 'Name', 'Email', 'Training',
-                          'Training Date', 'Issued', 'Downloaded'])
-        for c in Certificate.query.order_by(Certificate.issued_at).all():
-            writer.writerow([c.certificate_number, c.rsvp.name, c.rsvp.email,
-                              c.rsvp.training.location_name, c.rsvp.training.date,
-                              c.issued_at, c.downloaded])
+        header = ['Certificate #', 'Name', 'Email', 'Training',
+                  'Training Date', 'Issued', 'Downloaded']
+
+        def rows():
+            query = Certificate.query.options(
+                joinedload(Certificate.rsvp).joinedload(RSVP.training)
+            ).order_by(Certificate.issued_at)
+            for c in query.yield_per(500):
+                yield [c.certificate_number, c.rsvp.name, c.rsvp.email,
+                       c.rsvp.training.location_name, c.rsvp.training.date,
+                       c.issued_at, c.downloaded]
 
     elif data_type == 'subscribers':
-        writer.writerow(['ID', 'Email', 'District', 'Signed Up'])
-        for s in Subscriber.query.order_by(Subscriber.created_at).all():
-            writer.writerow([s.id, s.email, s.district or 'Any', s.created_at])
+        header = ['ID', 'Email', 'District', 'Signed Up']
+
+        def rows():
+            for s in Subscriber.query.order_by(Subscriber.created_at).yield_per(500):
+                yield [s.id, s.email, s.district or 'Any', s.created_at]
     else:
         abort(404)
 
-    output = BytesIO()
-    output.write(si.getvalue().encode('utf-8'))
-    output.seek(0)
-    return send_file(output, mimetype='text/csv',
-                     download_name=f'cpr_challenge_{data_type}_{date.today()}.csv',
-                     as_attachment=True)
+    def generate():
+        # Flush each row to the client as it is written rather than
+        # assembling the whole file in memory first.
+        buf = StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(header)
+        for row in rows():
+            writer.writerow(row)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()
+
+    filename = f'cpr_challenge_{data_type}_{date.today()}.csv'
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 
 @app.route('/admin/settings', methods=['POST'])
@@ -915,6 +1323,7 @@ def admin_settings():
         flash('Goal target must be a positive number.', 'error')
         return redirect(url_for('admin_dashboard'))
     set_setting('goal_target', str(goal))
+    invalidate_public_caches()
 
     new_password = request.form.get('new_password', '').strip()
     if new_password:
@@ -1003,31 +1412,42 @@ def admin_reset_password(user_id):
 # SITEMAP & ROBOTS
 # =========================================================================
 
+_SITEMAP_BASE = 'https://cprchallengenh.com'
+_SITEMAP_PAGES = [
+    ('/', '1.0', 'weekly'),
+    ('/trainings', '0.9', 'daily'),
+    ('/host', '0.8', 'monthly'),
+    ('/about', '0.7', 'monthly'),
+    ('/map', '0.7', 'monthly'),
+    ('/leaderboard', '0.6', 'daily'),
+    ('/register-aed', '0.8', 'monthly'),
+]
+# Static head and tail never change, so only the training entries are built per refresh
+_SITEMAP_PREFIX = '\n'.join(
+    ['<?xml version="1.0" encoding="UTF-8"?>',
+     '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'] +
+    [f'<url><loc>{_SITEMAP_BASE}{path}</loc>'
+     f'<changefreq>{freq}</changefreq>'
+     f'<priority>{priority}</priority></url>'
+     for path, priority, freq in _SITEMAP_PAGES]
+).encode('utf-8')
+_SITEMAP_SUFFIX = b'\n</urlset>'
+
+
 @app.route('/sitemap.xml')
 def sitemap():
-    pages = [
-        ('/', '1.0', 'weekly'),
-        ('/trainings', '0.9', 'daily'),
-        ('/host', '0.8', 'monthly'),
-        ('/about', '0.7', 'monthly'),
-        ('/map', '0.7', 'monthly'),
-        ('/leaderboard', '0.6', 'daily'),
-        ('/register-aed', '0.8', 'monthly'),
-    ]
-    xml = ['<?xml version="1.0" encoding="UTF-8"?>',
-           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
-    base = 'https://cprchallengenh.com'
-    for path, priority, freq in pages:
-        xml.append(f'<url><loc>{base}{path}</loc>'
-                   f'<changefreq>{freq}</changefreq>'
-                   f'<priority>{priority}</priority></url>')
+    return Response(_sitemap_xml(), mimetype='application/xml')
+
+
+@ttl_cache(300)
+def _sitemap_xml():
     # Add individual training pages
-    for t in Training.query.filter_by(status='approved').all():
-        xml.append(f'<url><loc>{base}/rsvp/{t.id}</loc>'
-                   f'<changefreq>weekly</changefreq>'
-                   f'<priority>0.6</priority></url>')
-    xml.append('</urlset>')
-    return Response('\n'.join(xml), mimetype='application/xml')
+    training_ids = db.session.query(Training.id).filter_by(status='approved').all()
+    entries = ''.join(f'\n<url><loc>{_SITEMAP_BASE}/rsvp/{training_id}</loc>'
+                      f'<changefreq>weekly</changefreq>'
+                      f'<priority>0.6</priority></url>'
+                      for (training_id,) in training_ids)
+    return _SITEMAP_PREFIX + entries.encode('utf-8') + _SITEMAP_SUFFIX
 
 
 @app.route('/robots.txt')
@@ -1092,15 +1512,12 @@ def send_post_event_reminders():
     """Send reminder emails to hosts whose trainings were yesterday."""
     from datetime import timedelta
     yesterday = date.today() - timedelta(days=1)
+    # Skip trainings that already have a report
     trainings = Training.query.filter_by(
         status='approved', date=yesterday
-    ).all()
+    ).filter(~Training.attendances.any()).all()
     sent = 0
     for t in trainings:
-        # Skip if already reported
-        existing = Attendance.query.filter_by(training_id=t.id).first()
-        if existing:
-            continue
         try:
             send_host_post_event_reminder(t)
             sent += 1
@@ -1110,6 +1527,20 @@ def send_post_event_reminders():
     logger.info("Done. Sent %d reminder(s).", sent)
 
 
+@app.cli.command('init-db')
+def init_db_command():
+    """Create tables, indexes and default rows. Run once per deploy."""
+    init_db()
+    logger.info("Database initialized.")
+
+
+@app.cli.command('register-email-templates')
+def register_email_templates_command():
+    """Create or update the SES templates for bulk emails. Run once per deploy."""
+    register_templates()
+    logger.info("Email templates registered.")
+
+
 # ---------------------------------------------------------------------------
 # DB Init
 # ---------------------------------------------------------------------------
@@ -1125,6 +1556,19 @@ def init_db():
             conn.execute(text('ALTER TABLE trainings ADD COLUMN host_user_id INTEGER REFERENCES users(id)'))
             conn.commit()
 
+    # Migrate: add the denormalized rsvp_count column and backfill it
+    if 'rsvp_count' not in columns:
+        with db.engine.connect() as conn:
+            conn.execute(text('ALTER TABLE trainings ADD COLUMN rsvp_count INTEGER NOT NULL DEFAULT 0'))
+            conn.execute(text('UPDATE trainings SET rsvp_count = '
+                              '(SELECT COUNT(*) FROM rsvps WHERE rsvps.training_id = trainings.id)'))
+            conn.commit()
+
+    # Migrate: create_all() skips existing tables, so add any newly declared indexes
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
     # Create default admin user if none exists
     if not User.query.filter_by(role='admin').first():
         admin = User(
@@ -1140,8 +1584,28 @@ def init_db():
         set_setting('goal_target', os.getenv('GOAL_TARGET', '1000'))
 
 
-with app.app_context():
-    init_db()
+def init_db_once():
+    """Run init_db() under an exclusive file lock.
+
+    Gunicorn workers import this module concurrently; the lock makes them take
+    turns so only the first does any DDL and later ones find everything in place.
+    """
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, 'init_db.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with app.app_context():
+                init_db()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# Deploys that run `flask init-db` as a release step set FLASK_SKIP_DB_INIT=1
+# so workers start without touching the schema.
+if os.getenv('FLASK_SKIP_DB_INIT') != '1':
+    init_db_once()
 
 if __name__ == '__main__':
+    # Pool workers would re-import this whole module as __mp_main__
+    certificates.USE_PROCESS_POOL = False
     app.run(host='127.0.0.1', port=5011, debug=True)
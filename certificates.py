@@ -1,13 +1,21 @@
 """PDF certificate generation using ReportLab."""
 
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from io import BytesIO
+from reportlab import rl_config
 from reportlab.lib.pagesizes import landscape, letter
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
 from reportlab.lib.colors import HexColor
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfbase.ttfonts import TTFont
+from PIL import Image
 
 NAVY = HexColor('#0d1b2a')
 NAVY_MED = HexColor('#1e3a5f')
@@ -15,12 +23,61 @@ GOLD = HexColor('#c5a55a')
 DARK_TEXT = HexColor('#1a1a2e')
 GRAY = HexColor('#64748b')
 
+# Batches smaller than this render faster in-process than a pool can start up
+BULK_MIN_ITEMS = 16
+
+# Pool workers re-import the parent's __main__ module. That's cheap under
+# gunicorn or the flask CLI, but `python app.py` would have every worker re-run
+# all of app.py (DB init, executors, GeoJSON), so that entry point turns it off.
+USE_PROCESS_POOL = True
+
+# Embed streams as binary Flate data. The ASCII85 text wrapping ReportLab applies
+# by default is pure-Python work on ~3MB of image data per certificate.
+rl_config.useA85 = 0
+
+# Static artwork, decoded once at import rather than per certificate. The
+# readers share a file handle and decode lazily, so draw them under _IMAGE_LOCK.
+_img_dir = os.path.join(os.path.dirname(__file__), 'static', 'img')
+
+
+def _load_background(path):
+    """Re-encode the background PNG as an in-memory JPEG.
+
+    ReportLab embeds JPEG data as-is (DCTDecode), so each certificate copies
+    ~0.5MB of bytes instead of deflating 4.7MB of raw RGB pixels.
+    """
+    if not os.path.exists(path):
+        return None
+    jpeg = BytesIO()
+    Image.open(path).convert('RGB').save(jpeg, 'JPEG', quality=95)
+    jpeg.seek(0)
+    return ImageReader(jpeg)
+
+
+_BACKGROUND = _load_background(os.path.join(_img_dir, 'cert_background.png'))
+_seal_path = os.path.join(_img_dir, 'nh-seal.png')
+_SEAL = ImageReader(_seal_path) if os.path.exists(_seal_path) else None
+_IMAGE_LOCK = threading.Lock()
+
 # Register Lato font family
 _fonts_dir = os.path.join(os.path.dirname(__file__), 'static', 'fonts')
 pdfmetrics.registerFont(TTFont('Lato', os.path.join(_fonts_dir, 'Lato-Regular.ttf')))
 pdfmetrics.registerFont(TTFont('Lato-Bold', os.path.join(_fonts_dir, 'Lato-Bold.ttf')))
 pdfmetrics.registerFont(TTFont('Lato-Italic', os.path.join(_fonts_dir, 'Lato-Italic.ttf')))
 
+PAGE_WIDTH, PAGE_HEIGHT = landscape(letter)  # 11" x 8.5"
+
+
+@lru_cache(maxsize=32)
+def _centred_x(text, font, size):
+    """Left edge that centres a fixed line on the page, measured once."""
+    return PAGE_WIDTH / 2 - stringWidth(text, font, size) / 2
+
+
+def _draw_centred(c, y, text, font, size):
+    c.setFont(font, size)
+    c.drawString(_centred_x(text, font, size), y, text)
+
 
 def generate_certificate(name, date_str, location, certificate_number):
     """Generate a PDF participation certificate.
@@ -35,37 +92,44 @@ def generate_certificate(name, date_str, location, certificate_number):
         BytesIO containing the PDF
     """
     buf = BytesIO()
-    width, height = landscape(letter)  # 11" x 8.5"
-    c = canvas.Canvas(buf, pagesize=landscape(letter))
+    write_certificate(buf, name, date_str, location, certificate_number)
+    buf.seek(0)
+    return buf
+
 
-    # Background image (full-page ornate border)
-    bg_path = os.path.join(os.path.dirname(__file__), 'static', 'img', 'cert_background.png')
-    if os.path.exists(bg_path):
-        c.drawImage(bg_path, 0, 0, width, height)
+def write_certificate(fp, name, date_str, location, certificate_number):
+    """Render a certificate straight into a binary file object.
+
+    Takes the same arguments as generate_certificate(), after the file to
+    write to, so callers saving to disk skip the in-memory copy.
+    """
+    width, height = PAGE_WIDTH, PAGE_HEIGHT
+    c = canvas.Canvas(fp, pagesize=(width, height))
 
-    # NH state seal
-    seal_path = os.path.join(os.path.dirname(__file__), 'static', 'img', 'nh-seal.png')
     seal_size = 1.15 * inch
-    if os.path.exists(seal_path):
-        c.drawImage(seal_path,
-                     width / 2 - seal_size / 2, height - 2.35 * inch,
-                     seal_size, seal_size,
-                     preserveAspectRatio=True, mask='auto')
+    with _IMAGE_LOCK:
+        # Background image (full-page ornate border)
+        if _BACKGROUND is not None:
+            c.drawImage(_BACKGROUND, 0, 0, width, height)
+
+        # NH state seal
+        if _SEAL is not None:
+            c.drawImage(_SEAL,
+                        width / 2 - seal_size / 2, height - 2.35 * inch,
+                        seal_size, seal_size,
+                        preserveAspectRatio=True, mask='auto')
 
     # Title
     c.setFillColor(NAVY)
-    c.setFont('Times-Bold', 30)
-    c.drawCentredString(width / 2, height - 2.8 * inch, 'Certificate of Participation')
+    _draw_centred(c, height - 2.8 * inch, 'Certificate of Participation', 'Times-Bold', 30)
 
     # Subtitle
     c.setFillColor(GOLD)
-    c.setFont('Lato', 12)
-    c.drawCentredString(width / 2, height - 3.15 * inch, 'NH EMS Week CPR Challenge 2026')
+    _draw_centred(c, height - 3.15 * inch, 'NH EMS Week CPR Challenge 2026', 'Lato', 12)
 
     # "This certifies that"
     c.setFillColor(DARK_TEXT)
-    c.setFont('Lato', 11)
-    c.drawCentredString(width / 2, height - 3.7 * inch, 'This certifies that')
+    _draw_centred(c, height - 3.7 * inch, 'This certifies that', 'Lato', 11)
 
     # Participant name
     c.setFillColor(NAVY)
@@ -76,10 +140,10 @@ def generate_certificate(name, date_str, location, certificate_number):
         name_font_size = 24
     c.setFont('Times-BoldItalic', name_font_size)
     name_y = height - 4.3 * inch
-    c.drawCentredString(width / 2, name_y, name)
+    name_width = stringWidth(name, 'Times-BoldItalic', name_font_size)
+    c.drawString(width / 2 - name_width / 2, name_y, name)
 
     # Gold underline beneath name
-    name_width = c.stringWidth(name, 'Times-BoldItalic', name_font_size)
     line_extend = 30
     c.setStrokeColor(GOLD)
     c.setLineWidth(1.25)
@@ -88,11 +152,10 @@ def generate_certificate(name, date_str, location, certificate_number):
 
     # Description
     c.setFillColor(DARK_TEXT)
-    c.setFont('Lato', 11)
-    c.drawCentredString(width / 2, height - 4.85 * inch,
-                         'completed Hands-Only CPR awareness training')
-    c.drawCentredString(width / 2, height - 5.1 * inch,
-                         'during the New Hampshire EMS Week CPR Challenge')
+    _draw_centred(c, height - 4.85 * inch,
+                  'completed Hands-Only CPR awareness training', 'Lato', 11)
+    _draw_centred(c, height - 5.1 * inch,
+                  'during the New Hampshire EMS Week CPR Challenge', 'Lato', 11)
 
     # Date and location
     c.setFont('Lato-Bold', 11)
@@ -101,17 +164,17 @@ def generate_certificate(name, date_str, location, certificate_number):
 
     # "A bipartisan initiative"
     c.setFillColor(NAVY_MED)
-    c.setFont('Lato', 9)
-    c.drawCentredString(width / 2, height - 5.95 * inch,
-                         'A Bipartisan Initiative of the New Hampshire Executive Council')
+    _draw_centred(c, height - 5.95 * inch,
+                  'A Bipartisan Initiative of the New Hampshire Executive Council', 'Lato', 9)
 
     # Disclaimer
     c.setFillColor(GRAY)
-    c.setFont('Lato', 7.5)
-    c.drawCentredString(width / 2, 1.55 * inch,
-                         'This certificate recognizes participation in Hands-Only CPR awareness training.')
-    c.drawCentredString(width / 2, 1.35 * inch,
-                         'It is NOT an official CPR certification from the American Heart Association, Red Cross, or any other certifying body.')
+    _draw_centred(c, 1.55 * inch,
+                  'This certificate recognizes participation in Hands-Only CPR awareness training.',
+                  'Lato', 7.5)
+    _draw_centred(c, 1.35 * inch,
+                  'It is NOT an official CPR certification from the American Heart Association, '
+                  'Red Cross, or any other certifying body.', 'Lato', 7.5)
 
     # Certificate number
     c.setFont('Lato', 7)
@@ -119,5 +182,27 @@ def generate_certificate(name, date_str, location, certificate_number):
                          f'Certificate #{certificate_number}')
 
     c.save()
-    buf.seek(0)
-    return buf
+
+
+def _generate_certificate_bytes(item):
+    return generate_certificate(*item).getvalue()
+
+
+def generate_certificates_bulk(items):
+    """Generate many certificates in parallel across CPU cores.
+
+    Args:
+        items: Sequence of (name, date_str, location, certificate_number) tuples
+
+    Returns:
+        List of PDF bytes, in the same order as items
+    """
+    items = list(items)
+    workers = os.cpu_count() or 1
+    if not USE_PROCESS_POOL or len(items) < BULK_MIN_ITEMS or workers < 2:
+        return [_generate_certificate_bytes(item) for item in items]
+    # Fork copies this process's thread locks (email pool, SES and DB clients)
+    # mid-use; forkserver workers start from a clean single-threaded process.
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('forkserver')) as executor:
+        return list(executor.map(_generate_certificate_bytes, items, chunksize=8))
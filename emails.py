@@ -1,48 +1,102 @@
 """Email notifications via AWS SES."""
 
+import json
 import logging
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from functools import lru_cache
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+SENDER_NAME = os.getenv('SES_SENDER_NAME', 'NH CPR Challenge')
+SENDER_EMAIL = os.getenv('SES_SENDER_EMAIL', 'info@cprchallengenh.com')
+APP_URL = os.getenv('APP_URL', 'https://cprchallengenh.com')
+_SOURCE = f'{SENDER_NAME} <{SENDER_EMAIL}>'
+_LIST_UNSUBSCRIBE = f'<mailto:{SENDER_EMAIL}?subject=unsubscribe>'
 
+# Parallel sends for multi-recipient blasts; matches the default SES send rate
+SES_MAX_CONCURRENCY = int(os.getenv('SES_MAX_CONCURRENCY', '14'))
+_send_executor = ThreadPoolExecutor(max_workers=SES_MAX_CONCURRENCY)
+
+
+class _TokenBucket:
+    """Token bucket that paces SES sends to a sustained messages-per-second rate.
+
+    Shared by every sending thread in the process. A request for more tokens
+    than are available (e.g. a 50-recipient bulk call) borrows against future
+    refills, and the caller sleeps until the debt would be repaid.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count=1):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= count
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+# SES account send rate, per process: divide by the worker count when running
+# several gunicorn workers against one account. Only the fan-out paths
+# (send_emails, send_bulk) draw from it, so one-off sends made while handling
+# a request never queue behind a bulk batch.
+_BUCKET = _TokenBucket(float(os.getenv('SES_RATE', '14')))
+
+
+@lru_cache(maxsize=1)
 def get_ses_client():
+    """Shared SES client. boto3 clients are thread-safe, so every sender
+    reuses one client and its pool of keep-alive connections."""
     return boto3.client(
         'ses',
         region_name=os.getenv('AWS_REGION', 'us-east-1'),
         aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
         aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        config=Config(max_pool_connections=64,
+                      retries={'max_attempts': 10, 'mode': 'adaptive'}),
     )
 
 
 def send_email(to, subject, html_body, plain_body=None):
     """Send an email via SES. Returns True on success."""
-    sender_name = os.getenv('SES_SENDER_NAME', 'NH CPR Challenge')
-    sender_email = os.getenv('SES_SENDER_EMAIL', 'info@cprchallengenh.com')
-
-    msg = MIMEMultipart('alternative')
+    # HTML-only mail goes out as a single text/html part; the alternative
+    # container is only needed when there's a plain-text version too
+    if plain_body:
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(plain_body, 'plain'))
+        msg.attach(MIMEText(html_body, 'html'))
+    else:
+        msg = MIMEText(html_body, 'html')
     msg['Subject'] = subject
-    msg['From'] = f'{sender_name} <{sender_email}>'
+    msg['From'] = _SOURCE
     msg['To'] = to
-    msg['Reply-To'] = sender_email
-    msg['List-Unsubscribe'] = f'<mailto:{sender_email}?subject=unsubscribe>'
+    msg['Reply-To'] = SENDER_EMAIL
+    msg['List-Unsubscribe'] = _LIST_UNSUBSCRIBE
     msg['List-Unsubscribe-Post'] = 'List-Unsubscribe=One-Click'
 
-    if plain_body:
-        msg.attach(MIMEText(plain_body, 'plain'))
-    msg.attach(MIMEText(html_body, 'html'))
-
     try:
         client = get_ses_client()
         client.send_raw_email(
-            Source=f'{sender_name} <{sender_email}>',
+            Source=_SOURCE,
             Destinations=[to],
-            RawMessage={'Data': msg.as_string()},
+            RawMessage={'Data': msg.as_bytes()},
         )
         return True
     except ClientError as e:
@@ -50,9 +104,21 @@ def send_email(to, subject, html_body, plain_body=None):
         return False
 
 
-def _email_wrapper(html):
-    """Wrap HTML content in a styled email template."""
-    return f"""<!DOCTYPE html>
+def send_emails(messages):
+    """Send many (to, subject, html_body) messages concurrently.
+
+    Returns the number sent successfully.
+    """
+    results = _send_executor.map(_send_paced, messages)
+    return sum(1 for ok in results if ok)
+
+
+def _send_paced(message):
+    _BUCKET.acquire()
+    return send_email(*message)
+
+
+_WRAPPER_PREFIX = """<!DOCTYPE html>
 <html>
 <head><meta charset="utf-8"><meta name="viewport" content="width=device-width"></head>
 <body style="margin:0;padding:0;background:#f4f4f5;font-family:Arial,sans-serif;">
@@ -63,7 +129,9 @@ def _email_wrapper(html):
 <h1 style="color:#ffffff;margin:0;font-size:22px;">NH CPR Challenge</h1>
 <p style="color:#d4a843;margin:4px 0 0;font-size:14px;">EMS Week 2026 &middot; May 17&ndash;23</p>
 </td></tr>
-<tr><td style="padding:32px 24px;">{html}</td></tr>
+<tr><td style="padding:32px 24px;">"""
+
+_WRAPPER_SUFFIX = """</td></tr>
 <tr><td style="background:#f8fafc;padding:16px 24px;text-align:center;font-size:12px;color:#64748b;">
 NH EMS Week CPR Challenge 2026<br>
 A bipartisan initiative of the New Hampshire Executive Council
@@ -73,22 +141,25 @@ A bipartisan initiative of the New Hampshire Executive Council
 </body></html>"""
 
 
-def send_rsvp_confirmation(rsvp, training):
-    """Send RSVP confirmation to attendee."""
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    html = _email_wrapper(f"""
+def _email_wrapper(html):
+    """Wrap HTML content in a styled email template."""
+    return _WRAPPER_PREFIX + html + _WRAPPER_SUFFIX
+
+
+# Message bodies, pre-wrapped at import; each send_* fills them with format_map
+_RSVP_CONFIRMATION_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">You're Registered!</h2>
-<p>Hi {rsvp.name},</p>
+<p>Hi {name},</p>
 <p>You're signed up for a free Hands-Only CPR training session. Here are the details:</p>
 <table style="width:100%;border-collapse:collapse;margin:16px 0;">
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Date</td>
-<td style="padding:8px;">{training.date.strftime('%A, %B %d, %Y')}</td></tr>
+<td style="padding:8px;">{date}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Time</td>
-<td style="padding:8px;">{training.start_time or 'TBD'}{(' - ' + training.end_time) if training.end_time else ''}</td></tr>
+<td style="padding:8px;">{time}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Location</td>
-<td style="padding:8px;">{training.location_name}<br>{training.address or ''}, {training.city or ''}</td></tr>
+<td style="padding:8px;">{location_name}<br>{address}, {city}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Host</td>
-<td style="padding:8px;">{training.organization or training.host_name}</td></tr>
+<td style="padding:8px;">{host}</td></tr>
 </table>
 <p><strong>What to expect:</strong> A quick 15-20 minute session where you'll learn the two steps of Hands-Only CPR: (1) Call 911, and (2) Push hard and fast in the center of the chest. No prior experience needed.</p>
 <p>After attending, you'll receive a certificate of participation.</p>
@@ -96,175 +167,354 @@ def send_rsvp_confirmation(rsvp, training):
 <a href="{app_url}/trainings" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">View All Trainings</a>
 </p>
 """)
-    return send_email(rsvp.email, 'Your CPR Training is Confirmed!', html)
 
-
-def send_rsvp_notification_to_host(rsvp, training):
-    """Notify host that someone RSVPed."""
-    html = _email_wrapper(f"""
+_RSVP_NOTIFICATION_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">New RSVP!</h2>
-<p>Hi {training.host_name},</p>
-<p>Someone has signed up for your CPR training on {training.date.strftime('%B %d')}:</p>
+<p>Hi {host_name},</p>
+<p>Someone has signed up for your CPR training on {date}:</p>
 <ul>
-<li><strong>Name:</strong> {rsvp.name}</li>
-<li><strong>Email:</strong> {rsvp.email}</li>
-{f'<li><strong>Phone:</strong> {rsvp.phone}</li>' if rsvp.phone else ''}
+<li><strong>Name:</strong> {name}</li>
+<li><strong>Email:</strong> {email}</li>
+{phone}
 </ul>
-<p>You now have <strong>{training.rsvps.count()}</strong> of {training.capacity} spots filled.</p>
+<p>You now have <strong>{rsvp_count}</strong> of {capacity} spots filled.</p>
 """)
-    return send_email(training.host_email, f'New RSVP for your CPR training - {rsvp.name}', html)
 
-
-def send_host_application_received(training):
-    """Confirm to host that their application was received."""
-    html = _email_wrapper(f"""
+_HOST_APPLICATION_RECEIVED_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">Application Received</h2>
-<p>Hi {training.host_name},</p>
+<p>Hi {host_name},</p>
 <p>Thank you for applying to host a free Hands-Only CPR training through the NH CPR Challenge! We've received your application and will review it shortly.</p>
 <table style="width:100%;border-collapse:collapse;margin:16px 0;">
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Location</td>
-<td style="padding:8px;">{training.location_name}</td></tr>
+<td style="padding:8px;">{location_name}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Date</td>
-<td style="padding:8px;">{training.date.strftime('%A, %B %d, %Y')}</td></tr>
+<td style="padding:8px;">{date}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">City</td>
-<td style="padding:8px;">{training.city or 'Not specified'}</td></tr>
+<td style="padding:8px;">{city}</td></tr>
 </table>
 <p>You'll receive another email once your training has been approved and is listed on the website.</p>
 <p style="color:#64748b;font-size:13px;">If you have any questions, reply to this email.</p>
 """)
-    return send_email(training.host_email, 'CPR Training Application Received', html)
 
-
-def send_training_approved(training):
-    """Notify host their training was approved. Includes host portal link."""
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    html = _email_wrapper(f"""
+_TRAINING_APPROVED_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">Your Training is Approved!</h2>
-<p>Hi {training.host_name},</p>
+<p>Hi {host_name},</p>
 <p>Great news! Your CPR training has been approved and is now listed on the NH CPR Challenge website.</p>
 <table style="width:100%;border-collapse:collapse;margin:16px 0;">
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Date</td>
-<td style="padding:8px;">{training.date.strftime('%A, %B %d, %Y')}</td></tr>
+<td style="padding:8px;">{date}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Location</td>
-<td style="padding:8px;">{training.location_name}</td></tr>
+<td style="padding:8px;">{location_name}</td></tr>
 </table>
 <p>After your event, please use this link to report attendance:</p>
 <p style="text-align:center;margin-top:24px;">
-<a href="{app_url}/host/report/{training.host_token}" style="display:inline-block;padding:12px 24px;background:#1e3a5f;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Report Attendance</a>
+<a href="{app_url}/host/report/{host_token}" style="display:inline-block;padding:12px 24px;background:#1e3a5f;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Report Attendance</a>
 </p>
 <p style="color:#64748b;font-size:13px;">Keep this link private — it's your unique portal for managing your training event.</p>
 """)
-    return send_email(training.host_email, 'Your CPR Training Has Been Approved!', html)
 
-
-def send_admin_new_host_application(training):
-    """Notify admin that a new host training application was submitted."""
-    admin_email = os.getenv('ADMIN_EMAIL', '')
-    if not admin_email:
-        logger.warning("ADMIN_EMAIL not set, skipping admin notification")
-        return
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    html = _email_wrapper(f"""
+_ADMIN_NEW_HOST_APPLICATION_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">New Host Application</h2>
 <p>A new training application has been submitted and needs review.</p>
 <table style="width:100%;border-collapse:collapse;margin:16px 0;">
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Host</td>
-<td style="padding:8px;">{training.host_name}</td></tr>
+<td style="padding:8px;">{host_name}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Email</td>
-<td style="padding:8px;">{training.host_email}</td></tr>
+<td style="padding:8px;">{host_email}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Organization</td>
-<td style="padding:8px;">{training.organization or 'N/A'}</td></tr>
+<td style="padding:8px;">{organization}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Location</td>
-<td style="padding:8px;">{training.location_name}, {training.city or ''}</td></tr>
+<td style="padding:8px;">{location_name}, {city}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Date</td>
-<td style="padding:8px;">{training.date.strftime('%A, %B %d, %Y')}</td></tr>
+<td style="padding:8px;">{date}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">District</td>
-<td style="padding:8px;">{training.district}</td></tr>
+<td style="padding:8px;">{district}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Capacity</td>
-<td style="padding:8px;">{training.capacity}</td></tr>
+<td style="padding:8px;">{capacity}</td></tr>
 </table>
 <p style="text-align:center;margin-top:24px;">
 <a href="{app_url}/admin/trainings" style="display:inline-block;padding:12px 24px;background:#1e3a5f;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Review in Admin</a>
 </p>
 """)
-    send_email(admin_email, f'New CPR Training Application — {training.host_name}', html)
-
 
-def send_subscriber_training_notification(subscriber_email, training):
-    """Notify a subscriber that a new training is available in their district."""
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    html = _email_wrapper(f"""
+_SUBSCRIBER_TRAINING_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">New CPR Training Near You!</h2>
 <p>A free Hands-Only CPR training has been scheduled in your area during EMS Week 2026.</p>
 <table style="width:100%;border-collapse:collapse;margin:16px 0;">
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Date</td>
-<td style="padding:8px;">{training.date.strftime('%A, %B %d, %Y')}</td></tr>
+<td style="padding:8px;">{date}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Time</td>
-<td style="padding:8px;">{training.start_time or 'TBD'}{(' - ' + training.end_time) if training.end_time else ''}</td></tr>
+<td style="padding:8px;">{time}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Location</td>
-<td style="padding:8px;">{training.location_name}<br>{training.address or ''}, {training.city or ''}</td></tr>
+<td style="padding:8px;">{location_name}<br>{address}, {city}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Hosted by</td>
-<td style="padding:8px;">{training.organization or training.host_name}</td></tr>
+<td style="padding:8px;">{host}</td></tr>
 </table>
 <p>Spots are limited — sign up now to reserve your place!</p>
 <p style="text-align:center;margin-top:24px;">
-<a href="{app_url}/rsvp/{training.id}" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">RSVP Now</a>
+<a href="{app_url}/rsvp/{training_id}" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">RSVP Now</a>
 </p>
 <p style="color:#64748b;font-size:13px;">You're receiving this because you signed up for CPR training notifications at cprchallengenh.com.</p>
 """)
-    send_email(subscriber_email, f'New CPR Training in {training.city} — {training.date.strftime("%B %d")}', html)
 
-
-def send_training_cancelled_to_rsvp(rsvp, training):
-    """Notify an attendee that a training they RSVPed for has been cancelled."""
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    html = _email_wrapper(f"""
+_TRAINING_CANCELLED_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">Training Cancelled</h2>
-<p>Hi {rsvp.name},</p>
+<p>Hi {name},</p>
 <p>We're sorry to let you know that the CPR training you signed up for has been cancelled.</p>
 <table style="width:100%;border-collapse:collapse;margin:16px 0;">
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Date</td>
-<td style="padding:8px;">{training.date.strftime('%A, %B %d, %Y')}</td></tr>
+<td style="padding:8px;">{date}</td></tr>
 <tr><td style="padding:8px;font-weight:bold;color:#1e3a5f;">Location</td>
-<td style="padding:8px;">{training.location_name}, {training.city or ''}</td></tr>
+<td style="padding:8px;">{location_name}, {city}</td></tr>
 </table>
 <p>Please check the website for other available trainings in your area.</p>
 <p style="text-align:center;margin-top:24px;">
 <a href="{app_url}/trainings" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Find Another Training</a>
 </p>
 """)
-    return send_email(rsvp.email, 'CPR Training Cancelled', html)
-
 
-def send_host_post_event_reminder(training):
-    """Remind host to submit attendance count after their event."""
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    if not training.host_token:
-        return
-    html = _email_wrapper(f"""
+_HOST_POST_EVENT_REMINDER_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">How Did It Go?</h2>
-<p>Hi {training.host_name},</p>
-<p>Your CPR training at <strong>{training.location_name}</strong> was scheduled for yesterday. Thank you for hosting!</p>
+<p>Hi {host_name},</p>
+<p>Your CPR training at <strong>{location_name}</strong> was scheduled for yesterday. Thank you for hosting!</p>
 <p>Please take a moment to report how many people attended. This helps us track the CPR Challenge progress and issue certificates to participants.</p>
 <p style="text-align:center;margin-top:24px;">
-<a href="{app_url}/host/report/{training.host_token}" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Report Attendance</a>
+<a href="{app_url}/host/report/{host_token}" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Report Attendance</a>
 </p>
 <p style="color:#64748b;font-size:13px;">If you already submitted your report, you can ignore this email. Thank you!</p>
 """)
-    send_email(training.host_email, 'How did your CPR training go? Please report attendance', html)
-
 
-def send_certificate_ready(rsvp, certificate):
-    """Notify attendee their certificate is available."""
-    app_url = os.getenv('APP_URL', 'https://cprchallengenh.com')
-    html = _email_wrapper(f"""
+_CERTIFICATE_READY_HTML = _email_wrapper("""
 <h2 style="color:#1e3a5f;margin-top:0;">Your Certificate is Ready!</h2>
-<p>Hi {rsvp.name},</p>
+<p>Hi {name},</p>
 <p>Thank you for participating in the NH CPR Challenge! Your certificate of participation is ready to download.</p>
-<p><strong>Certificate #:</strong> {certificate.certificate_number}</p>
+<p><strong>Certificate #:</strong> {certificate_number}</p>
 <p style="text-align:center;margin-top:24px;">
-<a href="{app_url}/certificate/{certificate.certificate_number}" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Download Certificate</a>
+<a href="{app_url}/certificate/{certificate_number}" style="display:inline-block;padding:12px 24px;background:#d4a843;color:#ffffff;text-decoration:none;border-radius:6px;font-weight:bold;">Download Certificate</a>
 </p>
 <p style="color:#64748b;font-size:13px;">Note: This certificate recognizes your participation in Hands-Only CPR awareness training. It is not an official CPR certification.</p>
 """)
-    return send_email(rsvp.email, 'Your CPR Challenge Certificate is Ready!', html)
+
+
+def _time_range(training):
+    return f"{training.start_time or 'TBD'}{(' - ' + training.end_time) if training.end_time else ''}"
+
+
+def send_rsvp_confirmation(rsvp, training):
+    """Send RSVP confirmation to attendee."""
+    html = _RSVP_CONFIRMATION_HTML.format_map({
+        'name': rsvp.name,
+        'date': training.date.strftime('%A, %B %d, %Y'),
+        'time': _time_range(training),
+        'location_name': training.location_name,
+        'address': training.address or '',
+        'city': training.city or '',
+        'host': training.organization or training.host_name,
+        'app_url': APP_URL,
+    })
+    return send_email(rsvp.email, 'Your CPR Training is Confirmed!', html)
+
+
+def send_rsvp_notification_to_host(rsvp, training):
+    """Notify host that someone RSVPed."""
+    html = _RSVP_NOTIFICATION_HTML.format_map({
+        'host_name': training.host_name,
+        'date': training.date.strftime('%B %d'),
+        'name': rsvp.name,
+        'email': rsvp.email,
+        'phone': f'<li><strong>Phone:</strong> {rsvp.phone}</li>' if rsvp.phone else '',
+        'rsvp_count': training.rsvp_count,
+        'capacity': training.capacity,
+    })
+    return send_email(training.host_email, f'New RSVP for your CPR training - {rsvp.name}', html)
+
+
+def send_host_application_received(training):
+    """Confirm to host that their application was received."""
+    html = _HOST_APPLICATION_RECEIVED_HTML.format_map({
+        'host_name': training.host_name,
+        'location_name': training.location_name,
+        'date': training.date.strftime('%A, %B %d, %Y'),
+        'city': training.city or 'Not specified',
+    })
+    return send_email(training.host_email, 'CPR Training Application Received', html)
+
+
+def send_training_approved(training):
+    """Notify host their training was approved. Includes host portal link."""
+    html = _TRAINING_APPROVED_HTML.format_map({
+        'host_name': training.host_name,
+        'date': training.date.strftime('%A, %B %d, %Y'),
+        'location_name': training.location_name,
+        'host_token': training.host_token,
+        'app_url': APP_URL,
+    })
+    return send_email(training.host_email, 'Your CPR Training Has Been Approved!', html)
+
+
+def send_admin_new_host_application(training):
+    """Notify admin that a new host training application was submitted."""
+    admin_email = os.getenv('ADMIN_EMAIL', '')
+    if not admin_email:
+        logger.warning("ADMIN_EMAIL not set, skipping admin notification")
+        return
+    html = _ADMIN_NEW_HOST_APPLICATION_HTML.format_map({
+        'host_name': training.host_name,
+        'host_email': training.host_email,
+        'organization': training.organization or 'N/A',
+        'location_name': training.location_name,
+        'city': training.city or '',
+        'date': training.date.strftime('%A, %B %d, %Y'),
+        'district': training.district,
+        'capacity': training.capacity,
+        'app_url': APP_URL,
+    })
+    send_email(admin_email, f'New CPR Training Application — {training.host_name}', html)
+
+
+def _subscriber_training_message(training):
+    html = _SUBSCRIBER_TRAINING_HTML.format_map({
+        'date': training.date.strftime('%A, %B %d, %Y'),
+        'time': _time_range(training),
+        'location_name': training.location_name,
+        'address': training.address or '',
+        'city': training.city or '',
+        'host': training.organization or training.host_name,
+        'training_id': training.id,
+        'app_url': APP_URL,
+    })
+    return f'New CPR Training in {training.city} — {training.date.strftime("%B %d")}', html
+
+
+def send_subscriber_training_notifications(subscriber_emails, training):
+    """Notify every subscriber in parallel. Returns the number sent."""
+    subject, html = _subscriber_training_message(training)
+    return send_emails([(email, subject, html) for email in subscriber_emails])
+
+
+def _training_cancelled_fields(rsvp, training):
+    return {
+        'name': rsvp.name,
+        'date': training.date.strftime('%A, %B %d, %Y'),
+        'location_name': training.location_name,
+        'city': training.city or '',
+        'app_url': APP_URL,
+    }
+
+
+def send_training_cancelled_to_rsvps(rsvps, training):
+    """Notify every attendee of a cancelled training. Returns the number sent."""
+    return send_bulk('cpr-training-cancelled',
+                     [(r.email, _training_cancelled_fields(r, training)) for r in rsvps])
+
+
+def send_host_post_event_reminder(training):
+    """Remind host to submit attendance count after their event."""
+    if not training.host_token:
+        return
+    html = _HOST_POST_EVENT_REMINDER_HTML.format_map({
+        'host_name': training.host_name,
+        'location_name': training.location_name,
+        'host_token': training.host_token,
+        'app_url': APP_URL,
+    })
+    send_email(training.host_email, 'How did your CPR training go? Please report attendance', html)
+
+
+def _certificate_ready_fields(rsvp, certificate):
+    return {
+        'name': rsvp.name,
+        'certificate_number': certificate.certificate_number,
+        'app_url': APP_URL,
+    }
+
+
+def send_certificates_ready(certificates):
+    """Notify each certificate's attendee in bulk. Returns the number sent."""
+    return send_bulk('cpr-certificate-ready',
+                     [(c.rsvp.email, _certificate_ready_fields(c.rsvp, c)) for c in certificates])
+
+
+# ---------------------------------------------------------------------------
+# Bulk sending
+# ---------------------------------------------------------------------------
+# Messages that go to every RSVP of a training are registered as SES templates
+# and sent up to 50 recipients per call. Placeholders keep the format_map
+# names, rewritten to SES's {{handlebars}} syntax. Subscriber notifications
+# stay on send_email because SES templated sends can't carry List-Unsubscribe.
+#
+# Templates are registered by `flask register-email-templates` at deploy time,
+# not by each worker, so old and new workers in a rolling deploy don't
+# overwrite each other. Any batch SES won't take (template missing, no
+# ses:SendBulkTemplatedEmail permission, throttling) goes out through
+# send_emails() instead.
+SES_BULK_BATCH_SIZE = 50
+
+_BULK_TEMPLATES = {
+    'cpr-training-cancelled': ('CPR Training Cancelled', _TRAINING_CANCELLED_HTML),
+    'cpr-certificate-ready': ('Your CPR Challenge Certificate is Ready!', _CERTIFICATE_READY_HTML),
+}
+
+
+def register_templates():
+    """Create or update the SES templates used by send_bulk()."""
+    client = get_ses_client()
+    for name, (subject, html) in _BULK_TEMPLATES.items():
+        template = {
+            'TemplateName': name,
+            'SubjectPart': subject,
+            'HtmlPart': re.sub(r'\{(\w+)\}', r'{{\1}}', html),
+        }
+        try:
+            client.update_template(Template=template)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TemplateDoesNotExist':
+                raise
+            client.create_template(Template=template)
+
+
+def send_bulk(template_name, destinations):
+    """Send an SES template to many recipients, batched per API call.
+
+    Recipients SES rejects, or whose whole batch fails, are retried one by
+    one with send_emails().
+
+    Args:
+        template_name: Key of _BULK_TEMPLATES
+        destinations: List of (email, template_data) pairs
+
+    Returns:
+        Number of recipients sent successfully
+    """
+    client = get_ses_client()
+    sent = 0
+    failed = []
+    for i in range(0, len(destinations), SES_BULK_BATCH_SIZE):
+        batch = destinations[i:i + SES_BULK_BATCH_SIZE]
+        _BUCKET.acquire(len(batch))
+        try:
+            response = client.send_bulk_templated_email(
+                Source=_SOURCE,
+                ReplyToAddresses=[SENDER_EMAIL],
+                Template=template_name,
+                DefaultTemplateData='{}',
+                Destinations=[{
+                    'Destination': {'ToAddresses': [email]},
+                    'ReplacementTemplateData': json.dumps(data),
+                } for email, data in batch],
+            )
+        except ClientError as e:
+            logger.error("SES error sending %s batch: %s", template_name, e)
+            failed.extend(batch)
+            continue
+        for (email, data), status in zip(batch, response['Status']):
+            if status['Status'] == 'Success':
+                sent += 1
+            else:
+                logger.error("SES bulk error sending to %s: %s", email, status.get('Error'))
+                failed.append((email, data))
+
+    if failed:
+        subject, html = _BULK_TEMPLATES[template_name]
+        sent += send_emails([(email, subject, html.format_map(data)) for email, data in failed])
+    return sent
@@ -1,11 +1,93 @@
 """Geocoding utility using Nominatim (free, no API key)."""
 
+import os
+import sqlite3
+import threading
 import time
-import urllib.request
-import urllib.parse
-import json
 
-_last_request = 0
+import orjson
+import urllib3
+
+# Results are cached on disk; addresses Nominatim can't resolve are retried
+# after NEGATIVE_CACHE_TTL seconds in case the lookup failed transiently.
+CACHE_PATH = os.getenv('GEOCODE_CACHE_PATH',
+                       os.path.join(os.path.dirname(os.path.abspath(__file__)), 'geocode_cache.sqlite'))
+NEGATIVE_CACHE_TTL = 24 * 60 * 60
+
+# Lookups run inside the admin approve request, so a failing Nominatim gets one
+# retry; each attempt waits its turn under the 1 req/s limit.
+MAX_ATTEMPTS = 2
+_RETRY_STATUSES = {429, 502, 503, 504}
+
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+# One keep-alive pool for every lookup, so only the first request pays for the
+# TLS handshake. Retries are done in geocode_address() to keep them rate-limited.
+_http = urllib3.PoolManager(
+    num_pools=1,
+    maxsize=4,
+    headers={'User-Agent': 'NHCPRChallenge/1.0 (info@cprchallengenh.com)'},
+    retries=False,
+)
+
+_rate_lock = threading.Lock()
+_last_request = 0.0
+
+
+def _cache():
+    """Open the cache database on first use. Caller holds _cache_lock."""
+    global _cache_conn
+    if _cache_conn is None:
+        _cache_conn = sqlite3.connect(CACHE_PATH, timeout=5, check_same_thread=False)
+        _cache_conn.execute(
+            'CREATE TABLE IF NOT EXISTS geocode_cache '
+            '(key TEXT PRIMARY KEY, lat REAL, lng REAL, ts INTEGER NOT NULL)'
+        )
+        _cache_conn.commit()
+    return _cache_conn
+
+
+def _cache_get(key):
+    """Return (hit, (lat, lng)) for a cached lookup."""
+    try:
+        with _cache_lock:
+            row = _cache().execute(
+                'SELECT lat, lng, ts FROM geocode_cache WHERE key = ?', (key,)
+            ).fetchone()
+    except sqlite3.Error:
+        return False, (None, None)
+    if row is None:
+        return False, (None, None)
+    lat, lng, ts = row
+    if lat is None and time.time() - ts > NEGATIVE_CACHE_TTL:
+        return False, (None, None)
+    return True, (lat, lng)
+
+
+def _cache_put(key, lat, lng):
+    try:
+        with _cache_lock:
+            conn = _cache()
+            conn.execute('INSERT OR REPLACE INTO geocode_cache VALUES (?, ?, ?, ?)',
+                         (key, lat, lng, int(time.time())))
+            conn.commit()
+    except sqlite3.Error:
+        pass
+
+
+def _wait_for_rate_limit():
+    """Block until at least 1s has passed since the previous request.
+
+    The lock serializes threads in this process; the interval is measured on
+    the monotonic clock so wall-clock adjustments can't skip the wait.
+    """
+    global _last_request
+    with _rate_lock:
+        elapsed = time.monotonic() - _last_request
+        if elapsed < 1.0:
+            time.sleep(1.0 - elapsed)
+        _last_request = time.monotonic()
 
 
 def geocode_address(address, city, state='NH', zip_code=''):
@@ -14,37 +96,41 @@ def geocode_address(address, city, state='NH', zip_code=''):
     Returns (lat, lng) or (None, None) on failure.
     Rate-limited to 1 request per second per Nominatim policy.
     """
-    global _last_request
-
     parts = [p for p in [address, city, state, zip_code] if p]
     query = ', '.join(parts)
     if not query:
         return None, None
 
-    # Respect rate limit
-    elapsed = time.time() - _last_request
-    if elapsed < 1.0:
-        time.sleep(1.0 - elapsed)
-
-    params = urllib.parse.urlencode({
-        'q': query,
-        'format': 'json',
-        'limit': 1,
-        'countrycodes': 'us',
-    })
-    url = f'https://nominatim.openstreetmap.org/search?{params}'
-
-    req = urllib.request.Request(url, headers={
-        'User-Agent': 'NHCPRChallenge/1.0 (info@cprchallengenh.com)',
-    })
+    key = ','.join(p.strip().lower() for p in parts)
+    hit, coords = _cache_get(key)
+    if hit:
+        return coords
 
-    try:
-        _last_request = time.time()
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            if data:
-                return float(data[0]['lat']), float(data[0]['lon'])
-    except Exception:
-        pass
+    for _ in range(MAX_ATTEMPTS):
+        # Respect rate limit
+        _wait_for_rate_limit()
+        try:
+            resp = _http.request('GET', 'https://nominatim.openstreetmap.org/search', fields={
+                'q': query,
+                'format': 'json',
+                'limit': 1,
+                'countrycodes': 'us',
+            }, timeout=10)
+        except urllib3.exceptions.HTTPError:
+            continue
+        if resp.status in _RETRY_STATUSES:
+            continue
+        if resp.status != 200:
+            return None, None
+        try:
+            data = orjson.loads(resp.data)
+            lat, lng = (float(data[0]['lat']), float(data[0]['lon'])) if data else (None, None)
+        except Exception:
+            return None, None
+        break
+    else:
+        # Failed requests aren't cached, so the next save tries again
+        return None, None
 
-    return None, None
+    _cache_put(key, lat, lng)
+    return lat, lng
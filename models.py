@@ -3,6 +3,7 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
@@ -19,7 +20,7 @@ class User(UserMixin, db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    trainings = db.relationship('Training', backref='user', lazy='dynamic')
+    trainings = db.relationship('Training', back_populates='user', lazy='dynamic')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -86,6 +87,15 @@ DISTRICT_COLORS = {
 }
 
 
+# Training columns the trainings API returns verbatim; 'date' and
+# 'spots_remaining' are added by the API
+TRAINING_API_FIELDS = (
+    'id', 'host_name', 'organization', 'location_name', 'address', 'city',
+    'zip_code', 'latitude', 'longitude', 'district', 'start_time', 'end_time',
+    'capacity', 'description', 'status',
+)
+
+
 class Training(db.Model):
     __tablename__ = 'trainings'
 
@@ -111,38 +121,35 @@ class Training(db.Model):
     host_token = db.Column(db.String(64), unique=True)
     host_user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Denormalized RSVP count, kept in step by the RSVP insert/delete hooks below
+    rsvp_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
-    rsvps = db.relationship('RSVP', backref='training', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
-    attendances = db.relationship('Attendance', backref='training', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
+    user = db.relationship('User', back_populates='trainings')
+    # Plain lists, loaded on first access; selectinload() them on queries that
+    # touch them for many trainings.
+    rsvps = db.relationship('RSVP', back_populates='training', cascade='all, delete-orphan', passive_deletes=True)
+    attendances = db.relationship('Attendance', back_populates='training', cascade='all, delete-orphan', passive_deletes=True)
+
+    @property
+    def attendance(self):
+        """The training's attendance report, or None if it hasn't been filed."""
+        return self.attendances[0] if self.attendances else None
 
     @property
     def spots_remaining(self):
-        return max(0, self.capacity - self.rsvps.count())
+        return max(0, self.capacity - self.rsvp_count)
 
     @property
     def is_full(self):
         return self.spots_remaining == 0
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'host_name': self.host_name,
-            'organization': self.organization,
-            'location_name': self.location_name,
-            'address': self.address,
-            'city': self.city,
-            'zip_code': self.zip_code,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'district': self.district,
-            'date': self.date.isoformat() if self.date else None,
-            'start_time': self.start_time,
-            'end_time': self.end_time,
-            'capacity': self.capacity,
-            'spots_remaining': self.spots_remaining,
-            'description': self.description,
-            'status': self.status,
-        }
+    __table_args__ = (
+        db.Index('ix_training_status_date', 'status', 'date'),
+        db.Index('ix_training_district_status', 'district', 'status'),
+        # Host dashboard, and claiming trainings by email at login/registration
+        db.Index('ix_training_host_user_id', 'host_user_id'),
+        db.Index('ix_training_host_email', 'host_email'),
+    )
 
 
 class RSVP(db.Model):
@@ -157,13 +164,33 @@ class RSVP(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     attended = db.Column(db.Boolean, nullable=True, default=None)
 
-    certificate = db.relationship('Certificate', backref='rsvp', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    training = db.relationship('Training', back_populates='rsvps')
+    certificate = db.relationship('Certificate', back_populates='rsvp', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
 
     __table_args__ = (
         db.UniqueConstraint('training_id', 'email', name='uq_rsvp_training_email'),
     )
 
 
+def _adjust_rsvp_count(connection, training_id, delta):
+    trainings = Training.__table__
+    connection.execute(
+        trainings.update()
+        .where(trainings.c.id == training_id)
+        .values(rsvp_count=trainings.c.rsvp_count + delta)
+    )
+
+
+@event.listens_for(RSVP, 'after_insert')
+def _rsvp_inserted(mapper, connection, target):
+    _adjust_rsvp_count(connection, target.training_id, 1)
+
+
+@event.listens_for(RSVP, 'after_delete')
+def _rsvp_deleted(mapper, connection, target):
+    _adjust_rsvp_count(connection, target.training_id, -1)
+
+
 class Attendance(db.Model):
     __tablename__ = 'attendances'
 
@@ -175,6 +202,12 @@ class Attendance(db.Model):
     approved = db.Column(db.Boolean, default=False)
     notes = db.Column(db.Text)
 
+    training = db.relationship('Training', back_populates='attendances')
+
+    __table_args__ = (
+        db.Index('ix_attendance_training_approved', 'training_id', 'approved'),
+    )
+
 
 class Certificate(db.Model):
     __tablename__ = 'certificates'
@@ -185,6 +218,8 @@ class Certificate(db.Model):
     issued_at = db.Column(db.DateTime, default=datetime.utcnow)
     downloaded = db.Column(db.Boolean, default=False)
 
+    rsvp = db.relationship('RSVP', back_populates='certificate')
+
 
 class Subscriber(db.Model):
     __tablename__ = 'subscribers'
@@ -2,63 +2,109 @@
 """One-time script to simplify EC district GeoJSON for browser performance.
 
 Reduces coordinate precision and removes excess points using Douglas-Peucker
-algorithm. No external dependencies beyond stdlib.
+algorithm. Uses orjson (already an app dependency) for reading and writing.
+
+If Shapely 2.x is installed, simplification runs in GEOS with topology
+preserved; otherwise the pure-Python implementation below is used.
 """
 
-import json
-import math
+import gzip
 import sys
 
+import orjson
+
+try:
+    # set_precision is new in Shapely 2.0; 1.x falls back to pure Python too
+    from shapely import set_precision
+    from shapely.geometry import shape, mapping
+    HAVE_SHAPELY = True
+except ImportError:
+    HAVE_SHAPELY = False
 
-def point_line_distance(point, start, end):
-    """Perpendicular distance from point to line segment start-end."""
-    if start == end:
-        return math.sqrt((point[0] - start[0])**2 + (point[1] - start[1])**2)
 
-    dx = end[0] - start[0]
-    dy = end[1] - start[1]
-    t = max(0, min(1, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / (dx * dx + dy * dy)))
-    proj_x = start[0] + t * dx
-    proj_y = start[1] + t * dy
-    return math.sqrt((point[0] - proj_x)**2 + (point[1] - proj_y)**2)
+# Coordinates are simplified on an integer grid of 5 decimal places (~1m),
+# the precision the output is written at. Integer math makes the distance test
+# exact and lets duplicate points be dropped by simple equality.
+COORD_PRECISION = 5
+SCALE = 10 ** COORD_PRECISION
 
 
 def douglas_peucker(coords, epsilon):
-    """Simplify a polyline using the Douglas-Peucker algorithm."""
-    if len(coords) <= 2:
+    """Simplify a polyline of integer grid points using Douglas-Peucker.
+
+    epsilon is in grid units. Works iteratively over (first, last) index
+    ranges with a keep-mask. Distances to a segment of squared length L are
+    compared as dist² * L, which is an exact integer, so no division or sqrt
+    is needed.
+    """
+    n = len(coords)
+    if n <= 2:
         return coords
 
-    max_dist = 0
-    max_idx = 0
-    for i in range(1, len(coords) - 1):
-        dist = point_line_distance(coords[i], coords[0], coords[-1])
-        if dist > max_dist:
-            max_dist = dist
-            max_idx = i
-
-    if max_dist > epsilon:
-        left = douglas_peucker(coords[:max_idx + 1], epsilon)
-        right = douglas_peucker(coords[max_idx:], epsilon)
-        return left[:-1] + right
-    else:
-        return [coords[0], coords[-1]]
-
-
-def round_coords(coords, precision=5):
-    """Round coordinate values to reduce file size."""
-    return [round(c, precision) for c in coords]
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    epsilon_sq = epsilon * epsilon
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        sx, sy = coords[first]
+        ex, ey = coords[last]
+        dx = ex - sx
+        dy = ey - sy
+        seg_len_sq = dx * dx + dy * dy
+        scale = seg_len_sq or 1
+
+        max_dist = 0
+        max_idx = 0
+        for i in range(first + 1, last):
+            px = coords[i][0] - sx
+            py = coords[i][1] - sy
+            dot = px * dx + py * dy
+            if seg_len_sq == 0 or dot <= 0:
+                # Nearest to the start point
+                dist = (px * px + py * py) * scale
+            elif dot >= seg_len_sq:
+                # Nearest to the end point
+                qx = coords[i][0] - ex
+                qy = coords[i][1] - ey
+                dist = (qx * qx + qy * qy) * scale
+            else:
+                # Perpendicular: dist² * L == cross²
+                cross = px * dy - py * dx
+                dist = cross * cross
+            if dist > max_dist:
+                max_dist = dist
+                max_idx = i
+
+        if max_dist > epsilon_sq * scale:
+            keep[max_idx] = True
+            stack.append((first, max_idx))
+            stack.append((max_idx, last))
+
+    return [c for c, k in zip(coords, keep) if k]
+
+
+def quantize_ring(ring):
+    """Snap a ring to the integer grid, dropping consecutive duplicates."""
+    points = []
+    for c in ring:
+        point = (round(c[0] * SCALE), round(c[1] * SCALE))
+        if not points or points[-1] != point:
+            points.append(point)
+    return points
 
 
 def simplify_ring(ring, epsilon):
     """Simplify a polygon ring."""
-    simplified = douglas_peucker(ring, epsilon)
+    points = quantize_ring(ring)
+    simplified = douglas_peucker(points, round(epsilon * SCALE))
     # Ensure ring is closed
     if simplified[0] != simplified[-1]:
         simplified.append(simplified[0])
     # Polygon needs at least 4 points (3 + closing)
     if len(simplified) < 4:
-        return ring
-    return [round_coords(c) for c in simplified]
+        simplified = points
+    return [[x / SCALE, y / SCALE] for x, y in simplified]
 
 
 def simplify_geometry(geometry, epsilon):
@@ -79,6 +125,15 @@ def simplify_geometry(geometry, epsilon):
     return geometry
 
 
+def simplify_geometry_shapely(geometry, epsilon):
+    """Simplify a GeoJSON geometry with GEOS, snapped to the output grid."""
+    geom = shape(geometry).simplify(epsilon, preserve_topology=True)
+    geom = set_precision(geom, 1 / SCALE)
+    if geom.is_empty:
+        return simplify_geometry(geometry, epsilon)
+    return mapping(geom)
+
+
 def main():
     input_path = '/Users/chrismaidment/Downloads/New_Hampshire_Executive_Council_District_Boundaries_-_2022.geojson'
     output_path = '/Users/chrismaidment/nh-cpr-challenge/static/data/ec-districts.geojson'
@@ -86,10 +141,14 @@ def main():
     # Epsilon in degrees - ~0.002 degrees ≈ 200m, good for state-level map
     epsilon = 0.002
 
-    with open(input_path) as f:
-        data = json.load(f)
+    with open(input_path, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw)
 
-    print(f"Input: {len(json.dumps(data))} chars, {len(data['features'])} features")
+    print(f"Input: {len(raw)} bytes, {len(data['features'])} features")
+
+    simplify = simplify_geometry_shapely if HAVE_SHAPELY else simplify_geometry
+    print(f"Simplifying with {'Shapely/GEOS' if HAVE_SHAPELY else 'pure Python'}")
 
     new_features = []
     for feature in data['features']:
@@ -99,26 +158,33 @@ def main():
             'properties': {
                 'district': district,
             },
-            'geometry': simplify_geometry(feature['geometry'], epsilon)
+            'geometry': simplify(feature['geometry'], epsilon)
         }
         new_features.append(new_feature)
 
-        old_chars = len(json.dumps(feature['geometry']))
-        new_chars = len(json.dumps(new_feature['geometry']))
-        print(f"  District {district}: {old_chars} -> {new_chars} chars ({100*new_chars/old_chars:.1f}%)")
+        old_size = len(orjson.dumps(feature['geometry']))
+        new_size = len(orjson.dumps(new_feature['geometry']))
+        print(f"  District {district}: {old_size} -> {new_size} bytes ({100*new_size/old_size:.1f}%)")
 
     output = {
         'type': 'FeatureCollection',
         'features': new_features
     }
 
-    output_str = json.dumps(output)
-    print(f"\nOutput: {len(output_str)} chars ({len(output_str)/1024:.1f} KB)")
+    # Encode once; the same bytes are measured and written
+    output_bytes = orjson.dumps(output)
+    print(f"\nOutput: {len(output_bytes)} bytes ({len(output_bytes)/1024:.1f} KB)")
+
+    with open(output_path, 'wb') as f:
+        f.write(output_bytes)
 
-    with open(output_path, 'w') as f:
-        json.dump(output, f)
+    # Pre-compressed copy served to clients that accept gzip. mtime=0 keeps the
+    # file byte-identical across runs so its ETag only changes with the data.
+    gz_bytes = gzip.compress(output_bytes, compresslevel=9, mtime=0)
+    with open(output_path + '.gz', 'wb') as f:
+        f.write(gz_bytes)
 
-    print(f"Saved to {output_path}")
+    print(f"Saved to {output_path} (+ .gz, {len(gz_bytes)/1024:.1f} KB)")
 
 
 if __name__ == '__main__':